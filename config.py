@@ -2,6 +2,8 @@
 import os
 import re
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 import logging
 
 # ---------- CONFIG ----------
@@ -19,11 +21,31 @@ TARGET_STORES = [
 YOHANANOF_USERNAME = "yohananof"
 YOHANANOF_PASSWORD = ""
 
-PAGE_WAIT = 0.6
+# stores crawled in parallel, each with its own Chrome driver
+STORE_WORKERS = 3
+
+# concurrent file downloads per provider
+DOWNLOAD_WORKERS = 4
 
 # AWS S3 config
 BUCKET_NAME = "govil-price-lists"   # <--- change to your bucket name if needed
-S3_CLIENT = boto3.client("s3")
+# shared by every store/download worker thread: pool sized for their combined uploads
+S3_CLIENT = boto3.client(
+    "s3",
+    config=Config(
+        max_pool_connections=64,
+        retries={"max_attempts": 3, "mode": "standard"},
+        tcp_keepalive=True,
+    ),
+)
+
+# multipart + concurrent part uploads for the larger PriceFull files
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True,
+)
 
 # logging
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(message)s")
@@ -33,3 +55,6 @@ logger = logging.getLogger("crawler")
 ABS_DATE_RE = re.compile(r"(\d{1,2}):(\d{2})\s+(\d{1,2})/(\d{1,2})/(\d{4})")
 REL_HE_RE = re.compile(r"לפני\s*(\d+)?\s*(שנייה|שניות|דקה|דקות|שעה|שעות|יום|ימים)", re.I)
 GZ_ONCLICK_RE = re.compile(r"Download\(['\"]([^'\"]+\.gz)['\"]\)", re.I)
+HREF_GZ_RE = re.compile(r'href=[\'"]([^\'"]+?\.gz)[\'"]', re.I)
+FNAME_DATE_RE = re.compile(r"(20\d{2})(\d{2})(\d{2})(\d{2})?(\d{2})?")
+SPATH_RE = re.compile(r'"SPath"\s*:\s*"([^"]+)"')
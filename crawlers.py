@@ -6,26 +6,34 @@ Downloads latest 2 price + latest 2 promo .gz files per provider.
 
 import os
 import re
-import time
+import json
+import shutil
 import logging
-import certifi
+import multiprocessing
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 from urllib.parse import urljoin, urlparse, unquote
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
+from driver import (  # single shared Chrome setup
+    STORE_ROW_XPATH, make_driver, wait_for, wait_for_navigation, wait_for_download_clicks, gz_link_count,
+)
+from utils import CA_BUNDLE, resolve_download_aspx, existing_s3_keys
+
 import boto3  # ADDED for AWS S3 upload
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 
 # ---------- CONFIG ----------
 BASE_LISTING_URL = "https://www.gov.il/he/pages/cpfta_prices_regulations"
 DOWNLOAD_DIR = os.path.join(os.getcwd(), "providers")
-HEADLESS = True
 VERIFY_SSL = True
 
 TARGET_STORES = [
@@ -36,14 +44,60 @@ TARGET_STORES = [
 
 YOHANANOF_USERNAME = "yohananof"
 YOHANANOF_PASSWORD = ""
+# session cookies saved after a successful login, reused on the next run
+YOHANANOF_COOKIES_PATH = os.path.join(os.getcwd(), ".yohananof_cookies.json")
+
+# [{tds: [innerText...], oc: button onclick, href: absolute .gz href}] for every table row
+TABLE_ROWS_JS = """
+return Array.from(document.querySelectorAll('table tr')).map(tr => {
+    const tds = Array.from(tr.querySelectorAll('td')).map(t => t.innerText);
+    const btn = tr.querySelector('button[onclick]');
+    const a = tr.querySelector('a[href*=".gz"]');
+    return {tds: tds, oc: btn ? btn.getAttribute('onclick') : null, href: a ? a.href : null};
+});
+"""
+# click the first 6 "הורדה" (also matches "להורדה") buttons in-page; returns how many were clicked.
+# There is one per file row, so the cap keeps a run from firing a Download() per file
+CLICK_DOWNLOAD_BUTTONS_JS = """
+const buttons = Array.from(document.querySelectorAll('button'))
+    .filter(b => /הורדה/.test(b.innerText))
+    .slice(0, 6);
+buttons.forEach(b => b.click());
+return buttons.length;
+"""
+FILL_INPUT_JS = (
+    "arguments[0].value = arguments[1];"
+    "arguments[0].dispatchEvent(new Event('input', {bubbles: true}));"
+)
 
-PAGE_WAIT = 0.6
+# keep a local copy under DOWNLOAD_DIR; when False files are streamed straight to S3
+SAVE_LOCAL = False
+
+# concurrent download+upload workers per provider
+DOWNLOAD_WORKERS = 8
+# read/write size for streamed downloads
+DOWNLOAD_CHUNK = 1024 * 1024
 
 # AWS S3 CONFIG 
 BUCKET_NAME = "govil-price-lists" 
 
-# Create the S3 client 
-s3_client = boto3.client("s3")
+# Create the S3 client: pool sized for the download workers' concurrent multipart uploads
+s3_client = boto3.client(
+    "s3",
+    config=Config(
+        max_pool_connections=64,
+        retries={"max_attempts": 3, "mode": "standard"},
+        tcp_keepalive=True,
+    ),
+)
+
+# multipart + concurrent part uploads for the larger PriceFull files
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=10,
+    use_threads=True,
+)
 
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(message)s")
 logger = logging.getLogger("crawler")
@@ -52,6 +106,16 @@ logger = logging.getLogger("crawler")
 ABS_DATE_RE = re.compile(r"(\d{1,2}):(\d{2})\s+(\d{1,2})/(\d{1,2})/(\d{4})")
 REL_HE_RE = re.compile(r"לפני\s*(\d+)?\s*(שנייה|שניות|דקה|דקות|שעה|שעות|יום|ימים)", re.I)
 GZ_ONCLICK_RE = re.compile(r"Download\(['\"]([^'\"]+\.gz)['\"]\)", re.I)
+HREF_GZ_RE = re.compile(r'href=[\'"]([^\'"]+?\.gz)[\'"]', re.I)
+YYYYMMDD_RE = re.compile(r"(20\d{2})(\d{2})(\d{2})(\d{2})?(\d{2})?")
+
+# REL_HE_RE unit -> timedelta keyword
+HE_UNITS = {
+    "שנייה": "seconds", "שניות": "seconds",
+    "דקה": "minutes", "דקות": "minutes",
+    "שעה": "hours", "שעות": "hours",
+    "יום": "days", "ימים": "days",
+}
 
 # ---------- helpers ----------
 def ensure_dir(p):
@@ -79,15 +143,19 @@ def parse_relative_he(text):
     unit = m.group(2)
     n = int(num) if num and num.isdigit() else 1
     now = datetime.now()
-    unit = unit.strip()
-    if unit.startswith("שנייה"): return now - timedelta(seconds=n)
-    if unit.startswith("דקה"): return now - timedelta(minutes=n)
-    if unit.startswith("שעה"):  return now - timedelta(hours=n)
-    if unit.startswith("יום"):   return now - timedelta(days=n)
-    return now
+    kind = HE_UNITS.get(unit.strip())
+    return now - timedelta(**{kind: n}) if kind else now
 
 def session_from_driver(driver):
     s = requests.Session()
+    # keep-alive pool sized for the download workers, with backoff on transient 5xx
+    adapter = HTTPAdapter(
+        pool_connections=20,
+        pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504]),
+    )
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
     ua = driver.execute_script("return navigator.userAgent;")
     s.headers.update({"User-Agent": ua})
     for c in driver.get_cookies():
@@ -96,42 +164,43 @@ def session_from_driver(driver):
 
 def download_stream(session, url, dest, verify=True):
     try:
-        verify_target = certifi.where() if verify else False
+        verify_target = CA_BUNDLE if verify else False
         with session.get(url, stream=True, timeout=60, verify=verify_target) as r:
             r.raise_for_status()
-            with open(dest, "wb") as fh:
-                for chunk in r.iter_content(8192):
-                    if chunk:
-                        fh.write(chunk)
+            r.raw.decode_content = True
+            with open(dest, "wb", buffering=DOWNLOAD_CHUNK) as fh:
+                shutil.copyfileobj(r.raw, fh, length=DOWNLOAD_CHUNK)
         return True
     except Exception as e:
         logger.error(f"Failed to download {url}: {e}")
         return False
 
-# ---------- Selenium ----------
-def make_driver(headless=HEADLESS):
-    opts = Options()
-    if headless:
-        opts.add_argument("--headless=new")
-    opts.add_argument("--window-size=1400,900")
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-dev-shm-usage")
-    opts.add_experimental_option("excludeSwitches", ["enable-automation"])
-    opts.add_experimental_option("useAutomationExtension", False)
-    driver = webdriver.Chrome(options=opts)
-    driver.set_page_load_timeout(45)
-    return driver
+def stream_to_s3(session, url, s3_key, verify=True):
+    """Pipe the HTTP response body straight into a multipart S3 upload (no local file)."""
+    try:
+        verify_target = CA_BUNDLE if verify else False
+        with session.get(url, stream=True, timeout=60, verify=verify_target) as r:
+            r.raise_for_status()
+            r.raw.decode_content = True
+            s3_client.upload_fileobj(r.raw, BUCKET_NAME, s3_key, Config=S3_TRANSFER_CONFIG)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to stream {url} to s3://{BUCKET_NAME}/{s3_key}: {e}")
+        return False
 
 # ---------- Crawler ----------
 class GovCrawler:
     def __init__(self, driver):
         self.driver = driver
 
-    def load_listing_rows(self):
+    def load_listing_rows(self, fragments=()):
         logger.info("Loading gov.il listing page")
         self.driver.get(BASE_LISTING_URL)
-        time.sleep(PAGE_WAIT)
+        # every wanted store's row must be there, not just the first
+        wait_for(self.driver, EC.presence_of_element_located((By.XPATH, "//table//tr")))
+        wait_for(self.driver, lambda d: all(
+            d.find_elements(By.XPATH, STORE_ROW_XPATH.format(f)) for f in fragments
+        ))
         parsed = []
         try:
             rows = self.driver.find_elements(By.XPATH, "//table//tr")
@@ -151,34 +220,38 @@ class GovCrawler:
                         anchor = r.find_element(By.XPATH, ".//a[@href]")
                     except Exception:
                         anchor = None
-                parsed.append((name, anchor, r))
+                # keep plain strings: WebElements go stale once the driver navigates
+                href = anchor.get_attribute("href") if anchor else None
+                parsed.append((name, href))
             except Exception:
                 continue
         return parsed
 
-    def find_store_anchor(self, fragment):
-        for name, anchor, row in self.load_listing_rows():
-            if fragment in name:
-                return name, anchor, row
-        return None, None, None
+    def find_store_links(self, stores):
+        """Load the listing once and map each (fragment, folder) to (name, href, folder)."""
+        rows = self.load_listing_rows([fragment for fragment, _ in stores])
+        found = []
+        for fragment, folder in stores:
+            match = next(((name, href) for name, href in rows if fragment in name and href), None)
+            if not match:
+                logger.warning(f"Store link not found for fragment '{fragment}'")
+                continue
+            found.append((match[0], match[1], folder))
+        return found
 
-    def open_provider(self, anchor):
-        href = anchor.get_attribute("href")
+    def open_provider(self, href):
         if not href:
             return None
+        prior = len(self.driver.window_handles)
         self.driver.execute_script("window.open(arguments[0]);", href)
-        time.sleep(0.6)
+        wait_for(self.driver, lambda d: len(d.window_handles) > prior)
         self.driver.switch_to.window(self.driver.window_handles[-1])
-        time.sleep(0.6)
+        wait_for(self.driver, lambda d: d.execute_script("return document.readyState") == "complete")
         return True
 
-    def process_store(self, fragment, folder):
-        logger.info(f"Processing: {fragment} -> {folder}")
-        name, anchor, row = self.find_store_anchor(fragment)
-        if not name or not anchor:
-            logger.warning(f"Store link not found for fragment '{fragment}'")
-            return
-        if not self.open_provider(anchor):
+    def process_store(self, name, href, folder):
+        logger.info(f"Processing: {name} -> {folder}")
+        if not self.open_provider(href):
             logger.warning("Could not open provider page")
             return
 
@@ -198,20 +271,59 @@ class GovCrawler:
             except Exception:
                 pass
 
+    def restore_cookies(self, path):
+        """Load saved session cookies into the current page; True if any were applied."""
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, encoding="utf-8") as fh:
+                cookies = json.load(fh)
+        except Exception as e:
+            logger.debug(f"Could not read cookies from {path}: {e}")
+            return False
+        applied = 0
+        for c in cookies:
+            try:
+                self.driver.add_cookie(c)
+                applied += 1
+            except Exception:
+                continue
+        if not applied:
+            return False
+        self.driver.refresh()
+        wait_for(self.driver, lambda d: d.execute_script("return document.readyState") == "complete")
+        return True
+
+    def save_cookies(self, path):
+        try:
+            # live session cookies: owner-only, also when overwriting an older file
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.chmod(path, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(self.driver.get_cookies(), fh)
+        except Exception as e:
+            logger.debug(f"Could not save cookies to {path}: {e}")
+
     # ----- Yohananof -----
     def handle_yohananof(self, folder):
-        logger.info("Yohananof: attempting login")
-        try:
-            wait = WebDriverWait(self.driver, 12)
-            u = wait.until(EC.presence_of_element_located((By.ID, "username")))
-            p = self.driver.find_element(By.ID, "password")
-            btn = self.driver.find_element(By.ID, "login-button")
-            u.clear(); u.send_keys(YOHANANOF_USERNAME)
-            p.clear(); p.send_keys(YOHANANOF_PASSWORD or "")
-            btn.click()
-            time.sleep(1.2)
-        except TimeoutException:
-            logger.debug("Login form not present (maybe already logged in)")
+        if self.restore_cookies(YOHANANOF_COOKIES_PATH) and not self.driver.find_elements(By.ID, "username"):
+            logger.info("Yohananof: reusing saved session")
+        else:
+            logger.info("Yohananof: attempting login")
+            try:
+                wait = WebDriverWait(self.driver, 12)
+                u = wait.until(EC.presence_of_element_located((By.ID, "username")))
+                p = self.driver.find_element(By.ID, "password")
+                btn = self.driver.find_element(By.ID, "login-button")
+                # set values in one call each instead of a round-trip per typed character
+                self.driver.execute_script(FILL_INPUT_JS, u, YOHANANOF_USERNAME)
+                self.driver.execute_script(FILL_INPUT_JS, p, YOHANANOF_PASSWORD or "")
+                btn.click()
+                wait_for(self.driver, EC.staleness_of(btn))
+                if not self.driver.find_elements(By.ID, "username"):
+                    self.save_cookies(YOHANANOF_COOKIES_PATH)
+            except TimeoutException:
+                logger.debug("Login form not present (maybe already logged in)")
 
         clicked = False
         possible_texts = ["Price", "Prices", "מחירים", "לצפייה במחירים", "PriceFull"]
@@ -224,7 +336,7 @@ class GovCrawler:
                     a.click()
                 except Exception:
                     self.driver.execute_script("arguments[0].click();", a)
-                time.sleep(1.0)
+                wait_for_navigation(self.driver, a)
                 clicked = True
                 break
             except Exception:
@@ -239,7 +351,7 @@ class GovCrawler:
                         el.click()
                     except Exception:
                         self.driver.execute_script("arguments[0].click();", el)
-                    time.sleep(1.0)
+                    wait_for_navigation(self.driver, el)
             except Exception:
                 pass
 
@@ -266,20 +378,16 @@ class GovCrawler:
     # ----- King-like providers -----
     def handle_kinglike(self, folder):
         logger.info("Generic king-like provider: trying to trigger BuildHtml / Download buttons")
+        links_before = gz_link_count(self.driver)
+        windows_before = len(self.driver.window_handles)
+        clicked = 0
         try:
-            buttons = self.driver.find_elements(By.XPATH, "//button[contains(normalize-space(.),'הורדה') or contains(normalize-space(.),'להורדה')]")
-            for b in buttons[:6]:
-                try:
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", b)
-                    try:
-                        b.click()
-                    except Exception:
-                        self.driver.execute_script("arguments[0].click();", b)
-                    time.sleep(0.12)
-                except Exception:
-                    pass
+            clicked = self.driver.execute_script(CLICK_DOWNLOAD_BUTTONS_JS)
+            logger.info(f"Clicked {clicked} download buttons")
         except Exception:
             pass
+        if clicked:
+            wait_for_download_clicks(self.driver, links_before, windows_before)
 
         rows = self.extract_table_rows_with_gz(relative_time=False)
         if not rows:
@@ -294,33 +402,32 @@ class GovCrawler:
 
     # ----- extraction helpers -----
     def extract_table_rows_with_gz(self, relative_time=False):
+        # one execute_script walks every row in-page instead of per-row WebDriver calls
         results = []
         try:
-            rows = self.driver.find_elements(By.XPATH, "//table//tr")
+            rows = self.driver.execute_script(TABLE_ROWS_JS) or []
         except Exception:
             rows = []
         for r in rows:
             try:
-                tds = r.find_elements(By.TAG_NAME, "td")
-                if not tds or len(tds) < 5:
+                tds = r.get("tds") or []
+                if len(tds) < 5:
                     continue
-                fname = tds[0].text.strip()
+                href = r.get("href")
+                fname = tds[0].strip()
                 if not fname.lower().endswith(".gz"):
-                    try:
-                        a = r.find_element(By.XPATH, ".//a[contains(@href,'.gz')]")
-                        href = a.get_attribute("href")
-                        fname = unquote(os.path.basename(urlparse(href).path))
-                    except Exception:
+                    if not href:
                         continue
-                type_text = tds[2].text.strip() if len(tds) >= 3 else ""
-                date_text = tds[4].text.strip() if len(tds) >= 5 else ""
+                    fname = unquote(os.path.basename(urlparse(href).path))
+                type_text = tds[2].strip()
+                date_text = tds[4].strip()
                 dt = None
                 if relative_time and "לפני" in date_text:
                     dt = parse_relative_he(date_text)
                 else:
                     dt = parse_absolute_he_date(date_text)
                 if dt is None:
-                    m = re.search(r"(20\d{2})(\d{2})(\d{2})(\d{2})?(\d{2})?", fname)
+                    m = YYYYMMDD_RE.search(fname)
                     if m:
                         try:
                             yyyy = int(m.group(1)); mm = int(m.group(2)); dd = int(m.group(3))
@@ -331,37 +438,28 @@ class GovCrawler:
                             dt = datetime.now()
                 dt = dt or datetime.now()
                 download_hint = None
-                try:
-                    btn = r.find_element(By.XPATH, ".//button[@onclick]")
-                    oc = btn.get_attribute("onclick") or ""
-                    m = GZ_ONCLICK_RE.search(oc)
-                    if m:
-                        download_hint = m.group(1)
-                except Exception:
-                    pass
-                try:
-                    a = r.find_element(By.XPATH, ".//a[contains(@href, '.gz')]")
-                    href = a.get_attribute("href")
-                    if href:
-                        download_hint = href
-                except Exception:
-                    pass
+                m = GZ_ONCLICK_RE.search(r.get("oc") or "")
+                if m:
+                    download_hint = m.group(1)
+                if href:
+                    download_hint = href
                 results.append({"filename": fname, "type": type_text, "date": dt, "download_hint": download_hint})
             except Exception:
                 continue
         return results
 
     def extract_gz_from_html(self, html, base):
-        found = []
-        for m in re.finditer(r'href=[\'"]([^\'"]+?\.gz)[\'"]', html, re.I):
+        # keyed by filename: the same file often shows up as both an href and an onclick,
+        # and the first (href, absolute URL) hit is the one worth keeping
+        found = {}
+        for m in HREF_GZ_RE.finditer(html):
             url = urljoin(base, m.group(1))
             fn = unquote(os.path.basename(urlparse(url).path))
-            found.append({"filename": fn, "type": "", "date": datetime.now(), "download_hint": url})
+            found.setdefault(fn, {"filename": fn, "type": "", "date": datetime.now(), "download_hint": url})
         for m in GZ_ONCLICK_RE.finditer(html):
             fn = m.group(1)
-            url = urljoin(base, fn)
-            found.append({"filename": fn, "type": "", "date": datetime.now(), "download_hint": fn})
-        return found
+            found.setdefault(fn, {"filename": fn, "type": "", "date": datetime.now(), "download_hint": fn})
+        return list(found.values())
 
     # ----- select & download -----
     def select_and_download_from_rows(self, rows, folder, session):
@@ -378,88 +476,126 @@ class GovCrawler:
         price = price[:2]; promo = promo[:2]
         logger.info(f"Will download {len(price)} price + {len(promo)} promo for {folder}")
 
+        existing = existing_s3_keys(s3_client, BUCKET_NAME, folder)
+        base = self.driver.current_url
+        parsed = urlparse(base)
+        base_root = f"{parsed.scheme}://{parsed.netloc}"
+        # only the DOM fallback needs Selenium (not thread-safe), so it runs here;
+        # Download.aspx resolution is plain HTTP and happens inside the workers
+        jobs = []
         for item in price + promo:
             final_url = None
+            download_ajax = None
             hint = item.get("download_hint")
             fn = item.get("filename")
+            if f"{folder}/{fn}" in existing:
+                logger.info(f"Skipping {fn}: already in s3://{BUCKET_NAME}/{folder}/")
+                continue
             if hint and isinstance(hint, str) and hint.lower().startswith("http"):
                 final_url = hint
             elif hint and isinstance(hint, str) and hint.lower().endswith(".gz"):
-                base = self.driver.current_url
-                parsed = urlparse(base)
-                base_root = f"{parsed.scheme}://{parsed.netloc}"
                 download_ajax = urljoin(base_root, "Download.aspx?FileNm=" + hint)
-                logger.info(f"Requesting Download.aspx for {fn}: {download_ajax}")
-                try:
-                    r = session.post(download_ajax, timeout=20, verify=certifi.where() if VERIFY_SSL else False)
-                    if r.status_code == 200:
-                        try:
-                            data = r.json()
-                            spath = ""
-                            if isinstance(data, list) and data:
-                                spath = data[0].get("SPath", "") or data[-1].get("SPath", "")
-                            elif isinstance(data, dict):
-                                spath = data.get("SPath", "")
-                            if spath:
-                                final_url = spath
-                                logger.info(f"Got SPath: {spath}")
-                        except Exception:
-                            txt = r.text or ""
-                            m = re.search(r'"SPath"\s*:\s*"([^"]+)"', txt)
-                            if m:
-                                final_url = m.group(1)
-                except Exception as e:
-                    logger.warning(f"Download.aspx call failed for {hint}: {e}")
             else:
                 try:
                     a = self.driver.find_element(By.XPATH, f"//a[contains(@href, '{fn}')]")
                     href = a.get_attribute("href")
                     if href:
-                        final_url = urljoin(self.driver.current_url, href)
+                        final_url = urljoin(base, href)
                 except Exception:
                     final_url = None
 
-            if not final_url:
+            if not final_url and not download_ajax:
                 logger.warning(f"Could not resolve final URL for {fn}; skipping")
                 continue
 
-            ensure_dir(os.path.join(DOWNLOAD_DIR, folder))
-            dest = os.path.join(DOWNLOAD_DIR, folder, fn)
-            logger.info(f"Downloading {final_url} -> {dest} (date={item.get('date')})")
-            ok = download_stream(session, final_url, dest, verify=VERIFY_SSL)
-            if not ok and VERIFY_SSL:
-                logger.warning("Retrying download with verify=False")
-                ok = download_stream(session, final_url, dest, verify=False)
+            jobs.append((item, fn, final_url, download_ajax))
 
-            # === Upload to S3 ===
-            if ok:
-                s3_key = f"{folder}/{fn}"
+        if not jobs:
+            return
+
+        ensure_dir(os.path.join(DOWNLOAD_DIR, folder))
+        with ThreadPoolExecutor(max_workers=min(DOWNLOAD_WORKERS, len(jobs))) as pool:
+            futures = {
+                pool.submit(self._fetch_and_upload, session, folder, fn, final_url, download_ajax, item.get("date")): fn
+                for item, fn, final_url, download_ajax in jobs
+            }
+            for fut in as_completed(futures):
                 try:
-                    s3_client.upload_file(dest, BUCKET_NAME, s3_key)
-                    logger.info(f"Uploaded to s3://{BUCKET_NAME}/{s3_key}")
+                    fut.result()
                 except Exception as e:
-                    logger.error(f"Failed to upload {fn} to S3: {e}")
-            # ====================
-
-            time.sleep(0.25)
+                    logger.error(f"Download/upload worker failed for {futures[fut]}: {e}")
+
+    def _fetch_and_upload(self, session, folder, fn, final_url, download_ajax=None, date=None):
+        if not final_url and download_ajax:
+            logger.info(f"Requesting Download.aspx for {fn}: {download_ajax}")
+            final_url = resolve_download_aspx(session, download_ajax, verify=VERIFY_SSL)
+        if not final_url:
+            logger.warning(f"Could not resolve final URL for {fn}; skipping")
+            return False
+
+        s3_key = f"{folder}/{fn}"
+        if not SAVE_LOCAL:
+            logger.info(f"Streaming {final_url} -> s3://{BUCKET_NAME}/{s3_key} (date={date})")
+            ok = stream_to_s3(session, final_url, s3_key, verify=VERIFY_SSL)
+            if not ok and VERIFY_SSL:
+                logger.warning("Retrying stream with verify=False")
+                ok = stream_to_s3(session, final_url, s3_key, verify=False)
+            if ok:
+                logger.info(f"Uploaded to s3://{BUCKET_NAME}/{s3_key}")
+            return ok
+
+        dest = os.path.join(DOWNLOAD_DIR, folder, fn)
+        logger.info(f"Downloading {final_url} -> {dest} (date={date})")
+        ok = download_stream(session, final_url, dest, verify=VERIFY_SSL)
+        if not ok and VERIFY_SSL:
+            logger.warning("Retrying download with verify=False")
+            ok = download_stream(session, final_url, dest, verify=False)
+
+        # === Upload to S3 ===
+        if ok:
+            try:
+                s3_client.upload_file(dest, BUCKET_NAME, s3_key, Config=S3_TRANSFER_CONFIG)
+                logger.info(f"Uploaded to s3://{BUCKET_NAME}/{s3_key}")
+            except Exception as e:
+                logger.error(f"Failed to upload {fn} to S3: {e}")
+        # ====================
+        return ok
 
 # ---------- main ----------
+def crawl_store(name, href, folder):
+    """Crawl one provider with its own Chrome; runs in a worker process."""
+    try:
+        driver = make_driver()
+    except Exception as e:
+        logger.exception(f"Store {folder} failed: could not start Chrome: {e}")
+        return
+    try:
+        GovCrawler(driver).process_store(name, href, folder)
+    except Exception as e:
+        logger.exception(f"Store {folder} failed: {e}")
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
 def main():
     ensure_dir(DOWNLOAD_DIR)
+    # the gov.il listing is the same for every store: read it once, then hand each worker its link
     driver = make_driver()
-    crawler = GovCrawler(driver)
     try:
-        for frag, folder in TARGET_STORES:
-            try:
-                crawler.process_store(frag, folder)
-            except Exception as e:
-                logger.exception(f"Store {frag} failed: {e}")
-            time.sleep(0.9)
+        stores = GovCrawler(driver).find_store_links(TARGET_STORES)
     finally:
         try:
             driver.quit()
         except Exception:
             pass
+    if not stores:
+        logger.warning("No store links found on the listing page")
+        return
+    # spawn (not fork): each worker re-imports this module and builds its own boto3 client
+    with multiprocessing.get_context("spawn").Pool(len(stores)) as pool:
+        pool.starmap(crawl_store, stores)
     logger.info("All done.")
 
 if __name__ == "__main__":
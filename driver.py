@@ -1,8 +1,26 @@
 # driver.py
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from config import HEADLESS
 
+# upper bound for explicit Selenium waits (returns as soon as the condition holds)
+WAIT_TIMEOUT = 10
+# provider file listing: a .gz link, or a table cell naming a .gz file
+FILES_READY_XPATH = "//a[contains(@href,'.gz')] | //table//tr/td[contains(., '.gz')]"
+# gov.il listing row for one store, once its link has rendered. Eager page loads return before
+# scripts finish rendering the table and rows fill in stages, so wait on this, not any first row
+STORE_ROW_XPATH = "//table//tr[td[contains(normalize-space(.), '{}')]][.//a[@href]]"
+# .gz links currently in the page; a click that loads files raises it
+GZ_LINK_COUNT_JS = "return document.querySelectorAll('a[href*=\".gz\"]').length;"
+# file-table rows that are already downloadable: a .gz link, or a button whose onclick names the file
+USABLE_FILE_ROWS_JS = (
+    "return document.querySelectorAll('table tr a[href*=\".gz\"], table tr button[onclick]').length;"
+)
+
 def make_driver(headless=HEADLESS):
     opts = Options()
     if headless:
@@ -12,8 +30,63 @@ def make_driver(headless=HEADLESS):
     opts.add_argument("--disable-gpu")
     opts.add_argument("--no-sandbox")
     opts.add_argument("--disable-dev-shm-usage")
+    # trim startup work: no extensions, background services or first-run UI
+    opts.add_argument("--disable-extensions")
+    opts.add_argument("--disable-background-networking")
+    opts.add_argument("--disable-default-apps")
+    opts.add_argument("--disable-sync")
+    opts.add_argument("--metrics-recording-only")
+    opts.add_argument("--no-first-run")
+    opts.add_argument("--disable-notifications")
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option("useAutomationExtension", False)
+    # scraping only needs the DOM: skip images and return from get() at DOMContentLoaded
+    opts.add_argument("--blink-settings=imagesEnabled=false")
+    opts.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+    })
+    opts.page_load_strategy = "eager"
     driver = webdriver.Chrome(options=opts)
     driver.set_page_load_timeout(45)
     return driver
+
+def wait_for(driver, condition, timeout=WAIT_TIMEOUT):
+    """Block until `condition` holds or `timeout` expires; returns False on timeout."""
+    try:
+        WebDriverWait(driver, timeout).until(condition)
+        return True
+    except TimeoutException:
+        return False
+
+def gz_link_count(driver):
+    try:
+        return driver.execute_script(GZ_LINK_COUNT_JS) or 0
+    except Exception:
+        return 0
+
+def wait_for_download_clicks(driver, links_before, windows_before, timeout=4):
+    """After clicking a provider's download buttons: wait for what the clicks produce.
+
+    The buttons sit in already-populated rows; when those rows carry a .gz href or an onclick
+    the file table is usable as is and there is nothing to wait for. Otherwise a click either
+    adds .gz links to the page or opens Download.aspx in a new window.
+    """
+    try:
+        if driver.execute_script(USABLE_FILE_ROWS_JS):
+            return True
+    except Exception:
+        pass
+    return wait_for(driver, lambda d: (
+        gz_link_count(d) > links_before or len(d.window_handles) > windows_before
+    ), timeout)
+
+def wait_for_navigation(driver, element, timeout=WAIT_TIMEOUT):
+    """After clicking `element`: wait until the old page goes away or a file listing is present.
+
+    A click that only starts a download (e.g. a direct .gz link) never makes `element` stale,
+    so the listing check lets it return right away instead of waiting out the timeout.
+    """
+    return wait_for(driver, EC.any_of(
+        EC.staleness_of(element),
+        EC.presence_of_element_located((By.XPATH, FILES_READY_XPATH)),
+    ), timeout)
@@ -1,7 +1,7 @@
 # gov_crawler.py
-import re
-import time
+import os
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin, urlparse, unquote
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -10,89 +10,119 @@ from selenium.common.exceptions import TimeoutException
 
 from config import (
     BASE_LISTING_URL,
-    PAGE_WAIT,
+    DOWNLOAD_DIR,
     TARGET_STORES,
     YOHANANOF_USERNAME,
     YOHANANOF_PASSWORD,
     VERIFY_SSL,
+    DOWNLOAD_WORKERS,
     logger,
     GZ_ONCLICK_RE,
+    HREF_GZ_RE,
+    FNAME_DATE_RE,
     S3_CLIENT,
+    S3_TRANSFER_CONFIG,
     BUCKET_NAME,
 )
 from utils import (
     ensure_dir,
     parse_absolute_he_date,
     parse_relative_he,
+    make_pooled_session,
     session_from_driver,
     download_stream,
     filename_from_url,
+    resolve_download_aspx,
+    existing_s3_keys,
 )
+from driver import (
+    STORE_ROW_XPATH, wait_for, wait_for_navigation, wait_for_download_clicks, gz_link_count,
+)
+
+# selectors reused on every page
+XPATH_ALL_ROWS = "//table//tr"
+
+# provider file table, read in-page: rows with at least 5 cells ->
+# {fname, type_text, date_text, href (absolute .gz link), onclick (button handler)}
+FILE_ROWS_JS = """
+return Array.from(document.querySelectorAll('table tr')).map(function (tr) {
+    var tds = tr.querySelectorAll('td');
+    if (tds.length < 5) return null;
+    var a = tr.querySelector('a[href*=".gz"]');
+    var btn = tr.querySelector('button[onclick]');
+    return {
+        fname: tds[0].innerText,
+        type_text: tds[2].innerText,
+        date_text: tds[4].innerText,
+        href: a ? a.href : null,
+        onclick: btn ? btn.getAttribute('onclick') : null
+    };
+}).filter(function (r) { return r !== null; });
+"""
+
+# gov.il listing, read in-page: [{name: first cell text, href: "view prices" link (or any link)}]
+LISTING_ROWS_JS = """
+return Array.from(document.querySelectorAll('table tr')).map(function (tr) {
+    var td = tr.querySelector('td');
+    if (!td) return null;
+    var links = Array.from(tr.querySelectorAll('a'));
+    var a = links.find(function (x) { return x.textContent.indexOf('לצפייה במחירים') >= 0; })
+        || tr.querySelector('a[href]');
+    return {name: td.innerText, href: a ? a.href : null};
+}).filter(function (r) { return r !== null; });
+"""
 
 class GovCrawler:
-    def __init__(self, driver):
+    def __init__(self, driver, session=None):
         self.driver = driver
+        # pooled keep-alive session owned by this crawler (one per driver, so stores crawled
+        # in parallel never share cookies/CSRF headers); cookies/UA are refreshed per provider
+        self.session = session if session is not None else make_pooled_session()
 
     # listing page
-    def load_listing_rows(self):
+    def load_listing_rows(self, fragment=None):
         logger.info("Loading gov.il listing page")
         self.driver.get(BASE_LISTING_URL)
-        time.sleep(PAGE_WAIT)
-        parsed = []
+        xpath = STORE_ROW_XPATH.format(fragment) if fragment else XPATH_ALL_ROWS
+        wait_for(self.driver, EC.presence_of_element_located((By.XPATH, xpath)))
         try:
-            rows = self.driver.find_elements(By.XPATH, "//table//tr")
+            rows = self.driver.execute_script(LISTING_ROWS_JS) or []
         except Exception:
             rows = []
-        for r in rows:
-            try:
-                tds = r.find_elements(By.XPATH, ".//td")
-                if not tds:
-                    continue
-                name = tds[0].text.strip()
-                anchor = None
-                try:
-                    anchor = r.find_element(By.XPATH, ".//a[contains(normalize-space(.),'לצפייה במחירים') or contains(.,'לצפייה במחירים')]")
-                except Exception:
-                    try:
-                        anchor = r.find_element(By.XPATH, ".//a[@href]")
-                    except Exception:
-                        anchor = None
-                parsed.append((name, anchor, r))
-            except Exception:
-                continue
-        return parsed
+        return [((r.get("name") or "").strip(), r.get("href") or None) for r in rows]
 
     def find_store_anchor(self, fragment):
-        for name, anchor, row in self.load_listing_rows():
+        for name, href in self.load_listing_rows(fragment):
             if fragment in name:
-                return name, anchor, row
-        return None, None, None
+                return name, href
+        return None, None
 
-    def open_provider(self, anchor):
-        href = anchor.get_attribute("href")
+    def open_provider(self, href):
         if not href:
             return None
+        prior = len(self.driver.window_handles)
         self.driver.execute_script("window.open(arguments[0]);", href)
-        time.sleep(0.6)
+        wait_for(self.driver, lambda d: len(d.window_handles) > prior)
         self.driver.switch_to.window(self.driver.window_handles[-1])
-        time.sleep(0.6)
+        wait_for(self.driver, EC.presence_of_element_located((By.TAG_NAME, "body")))
+        wait_for(self.driver, lambda d: d.execute_script("return document.readyState") == "complete")
         return True
 
     def process_store(self, fragment, folder):
         logger.info(f"Processing: {fragment} -> {folder}")
-        name, anchor, row = self.find_store_anchor(fragment)
+        name, href = self.find_store_anchor(fragment)
         if not name:
             logger.warning(f"Store fragment {fragment} not found")
             return
-        if not anchor:
+        if not href:
             logger.warning(f"No listing link for {name}")
             return
-        if not self.open_provider(anchor):
+        if not self.open_provider(href):
             logger.warning("Could not open provider page")
             return
 
         ensure_dir(f"{BUCKET_NAME}")  # no-op if already exists locally; kept for parity
-        ensure_dir(__import__("os").path.join(__import__("os").getcwd(), "providers", folder))
+        ensure_dir(os.path.join(DOWNLOAD_DIR, folder))
 
         try:
             if "יוחננוף" in name:
@@ -121,7 +151,7 @@ class GovCrawler:
             u.clear(); u.send_keys(YOHANANOF_USERNAME)
             p.clear(); p.send_keys(YOHANANOF_PASSWORD or "")
             btn.click()
-            time.sleep(1.2)
+            wait_for(self.driver, EC.staleness_of(btn))
         except TimeoutException:
             logger.debug("Login form not present (maybe already logged in)")
 
@@ -137,7 +167,7 @@ class GovCrawler:
                     a.click()
                 except Exception:
                     self.driver.execute_script("arguments[0].click();", a)
-                time.sleep(1.0)
+                wait_for_navigation(self.driver, a)
                 clicked = True
                 break
             except Exception:
@@ -152,7 +182,7 @@ class GovCrawler:
                         el.click()
                     except Exception:
                         self.driver.execute_script("arguments[0].click();", el)
-                    time.sleep(1.0)
+                    wait_for_navigation(self.driver, el)
             except Exception:
                 pass
 
@@ -164,7 +194,7 @@ class GovCrawler:
             logger.warning("Yohananof: no .gz files found")
             return
 
-        sess = session_from_driver(self.driver)
+        sess = session_from_driver(self.driver, self.session)
         # optional CSRF token
         try:
             meta = self.driver.find_element(By.XPATH, "//meta[@name='csrftoken']")
@@ -179,6 +209,9 @@ class GovCrawler:
     # Generic king-like providers
     def handle_kinglike(self, folder):
         logger.info("Generic king-like provider: attempt to trigger BuildHtml / Download buttons")
+        links_before = gz_link_count(self.driver)
+        windows_before = len(self.driver.window_handles)
+        buttons = []
         try:
             buttons = self.driver.find_elements(By.XPATH, "//button[contains(normalize-space(.),'הורדה') or contains(normalize-space(.),'להורדה')]")
             for b in buttons[:6]:
@@ -188,11 +221,12 @@ class GovCrawler:
                         b.click()
                     except Exception:
                         self.driver.execute_script("arguments[0].click();", b)
-                    time.sleep(0.12)
                 except Exception:
                     pass
         except Exception:
             pass
+        if buttons:
+            wait_for_download_clicks(self.driver, links_before, windows_before)
 
         rows = self.extract_table_rows_with_gz(relative_time=False)
         if not rows:
@@ -202,31 +236,27 @@ class GovCrawler:
             logger.warning("Generic: no files found on page")
             return
 
-        sess = session_from_driver(self.driver)
+        sess = session_from_driver(self.driver, self.session)
         self.select_and_download_from_rows(rows, folder, sess)
 
     # extraction helpers
     def extract_table_rows_with_gz(self, relative_time=False):
         results = []
+        # one round-trip for the whole table instead of ~5 WebDriver calls per row
         try:
-            rows = self.driver.find_elements(By.XPATH, "//table//tr")
+            rows = self.driver.execute_script(FILE_ROWS_JS) or []
         except Exception:
             rows = []
         for r in rows:
             try:
-                tds = r.find_elements(By.TAG_NAME, "td")
-                if not tds or len(tds) < 5:
-                    continue
-                fname = tds[0].text.strip()
+                href = r.get("href")
+                fname = (r.get("fname") or "").strip()
                 if not fname.lower().endswith(".gz"):
-                    try:
-                        a = r.find_element(By.XPATH, ".//a[contains(@href,'.gz')]")
-                        href = a.get_attribute("href")
-                        fname = unquote(urlparse(href).path.split("/")[-1])
-                    except Exception:
+                    if not href:
                         continue
-                type_text = tds[2].text.strip() if len(tds) >= 3 else ""
-                date_text = tds[4].text.strip() if len(tds) >= 5 else ""
+                    fname = unquote(urlparse(href).path.split("/")[-1])
+                type_text = (r.get("type_text") or "").strip()
+                date_text = (r.get("date_text") or "").strip()
                 dt = None
                 if relative_time and "לפני" in date_text:
                     dt = parse_relative_he(date_text)
@@ -234,7 +264,7 @@ class GovCrawler:
                     dt = parse_absolute_he_date(date_text)
                 if dt is None:
                     # fallback parse in filename
-                    m = re.search(r"(20\d{2})(\d{2})(\d{2})(\d{2})?(\d{2})?", fname)
+                    m = FNAME_DATE_RE.search(fname)
                     if m:
                         try:
                             yyyy = int(m.group(1)); mm = int(m.group(2)); dd = int(m.group(3))
@@ -246,21 +276,11 @@ class GovCrawler:
                 dt = dt or datetime.now()
                 # download hint (onclick or anchor)
                 download_hint = None
-                try:
-                    btn = r.find_element(By.XPATH, ".//button[@onclick]")
-                    oc = btn.get_attribute("onclick") or ""
-                    m = GZ_ONCLICK_RE.search(oc)
-                    if m:
-                        download_hint = m.group(1)
-                except Exception:
-                    pass
-                try:
-                    a = r.find_element(By.XPATH, ".//a[contains(@href, '.gz')]")
-                    href = a.get_attribute("href")
-                    if href:
-                        download_hint = href
-                except Exception:
-                    pass
+                m = GZ_ONCLICK_RE.search(r.get("onclick") or "")
+                if m:
+                    download_hint = m.group(1)
+                if href:
+                    download_hint = href
 
                 results.append({"filename": fname, "type": type_text, "date": dt, "download_hint": download_hint})
             except Exception:
@@ -269,7 +289,7 @@ class GovCrawler:
 
     def extract_gz_from_html(self, html, base):
         found = []
-        for m in re.finditer(r'href=[\'"]([^\'"]+?\.gz)[\'"]', html, re.I):
+        for m in HREF_GZ_RE.finditer(html):
             url = urljoin(base, m.group(1))
             fn = unquote(urlparse(url).path.split("/")[-1])
             found.append({"filename": fn, "type": "", "date": datetime.now(), "download_hint": url})
@@ -296,68 +316,80 @@ class GovCrawler:
         promo = promo[:2]
         logger.info(f"Will download {len(price)} price + {len(promo)} promo files for {folder}")
 
+        # provider file names carry their timestamp, so a key already in S3 is the same file
+        existing = existing_s3_keys(S3_CLIENT, BUCKET_NAME, folder)
+        # only the DOM fallback needs Selenium (not thread-safe), so it runs here; Download.aspx
+        # resolution is plain HTTP and runs inside the workers, overlapping across files.
+        # The page URL is read once here rather than per item (each read is a WebDriver call)
+        base = self.driver.current_url
+        parsed = urlparse(base)
+        base_root = f"{parsed.scheme}://{parsed.netloc}"
+        jobs = []
         for item in price + promo:
             final_url = None
+            download_ajax = None
             hint = item.get("download_hint")
             fn = item.get("filename")
+            if f"{folder}/{fn}" in existing:
+                logger.info(f"Skipping {fn}: already in s3://{BUCKET_NAME}/{folder}/")
+                continue
             # if hint is full url
             if hint and isinstance(hint, str) and hint.lower().startswith("http"):
                 final_url = hint
             elif hint and isinstance(hint, str) and hint.lower().endswith(".gz"):
-                base = self.driver.current_url
-                parsed = urlparse(base)
-                base_root = f"{parsed.scheme}://{parsed.netloc}"
                 download_ajax = urljoin(base_root, "Download.aspx?FileNm=" + hint)
-                logger.info(f"Requesting provider Download.aspx for {fn}: {download_ajax}")
-                try:
-                    r = session.post(download_ajax, timeout=20, verify= (True if VERIFY_SSL else False))
-                    if r.status_code == 200:
-                        try:
-                            data = r.json()
-                            spath = ""
-                            if isinstance(data, list) and data:
-                                spath = data[0].get("SPath", "") or data[-1].get("SPath", "")
-                            elif isinstance(data, dict):
-                                spath = data.get("SPath", "")
-                            if spath:
-                                final_url = spath
-                                logger.info(f"Got SPath: {spath}")
-                        except Exception:
-                            txt = r.text or ""
-                            m = re.search(r'"SPath"\s*:\s*"([^"]+)"', txt)
-                            if m:
-                                final_url = m.group(1)
-                except Exception as e:
-                    logger.warning(f"Download.aspx call failed for {hint}: {e}")
             else:
                 # fallback try to find anchor in DOM
                 try:
                     a = self.driver.find_element(By.XPATH, f"//a[contains(@href, '{fn}')]")
                     href = a.get_attribute("href")
                     if href:
-                        final_url = urljoin(self.driver.current_url, href)
+                        final_url = urljoin(base, href)
                 except Exception:
                     final_url = None
 
-            if not final_url:
+            if not final_url and not download_ajax:
                 logger.warning(f"Could not resolve final URL for {fn}; skipping")
                 continue
 
-            ensure_dir(__import__("os").path.join(__import__("os").getcwd(), "providers", folder))
-            dest = __import__("os").path.join(__import__("os").getcwd(), "providers", folder, fn)
-            logger.info(f"Downloading {final_url} -> {dest} (date={item.get('date')})")
-            ok = download_stream(session, final_url, dest, verify=VERIFY_SSL)
-            if not ok and VERIFY_SSL:
-                logger.warning("Retrying with verify=False")
-                ok = download_stream(session, final_url, dest, verify=False)
-
-            # upload to S3 if successful
-            if ok:
-                s3_key = f"{folder}/{fn}"
+            jobs.append((item, fn, final_url, download_ajax))
+
+        if not jobs:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(DOWNLOAD_WORKERS, len(jobs))) as pool:
+            futures = {
+                pool.submit(self.download_and_upload, session, folder, fn, final_url, download_ajax, item.get("date")): fn
+                for item, fn, final_url, download_ajax in jobs
+            }
+            for fut in as_completed(futures):
                 try:
-                    S3_CLIENT.upload_file(dest, BUCKET_NAME, s3_key)
-                    logger.info(f"Uploaded to s3://{BUCKET_NAME}/{s3_key}")
+                    fut.result()
                 except Exception as e:
-                    logger.error(f"Failed to upload {fn} to S3: {e}")
+                    logger.error(f"Download worker failed for {futures[fut]}: {e}")
+
+    def download_and_upload(self, session, folder, fn, final_url, download_ajax=None, date=None):
+        if not final_url and download_ajax:
+            logger.info(f"Requesting provider Download.aspx for {fn}: {download_ajax}")
+            final_url = resolve_download_aspx(session, download_ajax, verify=VERIFY_SSL)
+        if not final_url:
+            logger.warning(f"Could not resolve final URL for {fn}; skipping")
+            return False
 
-            time.sleep(0.35)
+        # providers/<folder> is created once in process_store
+        dest = os.path.join(DOWNLOAD_DIR, folder, fn)
+        logger.info(f"Downloading {final_url} -> {dest} (date={date})")
+        ok = download_stream(session, final_url, dest, verify=VERIFY_SSL)
+        if not ok and VERIFY_SSL:
+            logger.warning("Retrying with verify=False")
+            ok = download_stream(session, final_url, dest, verify=False)
+
+        # upload to S3 if successful; runs in the worker, so it overlaps the other downloads
+        if ok:
+            s3_key = f"{folder}/{fn}"
+            try:
+                S3_CLIENT.upload_file(dest, BUCKET_NAME, s3_key, Config=S3_TRANSFER_CONFIG)
+                logger.info(f"Uploaded to s3://{BUCKET_NAME}/{s3_key}")
+            except Exception as e:
+                logger.error(f"Failed to upload {fn} to S3: {e}")
+        return ok
@@ -1,26 +1,31 @@
 # main.py
-from config import DOWNLOAD_DIR, TARGET_STORES, logger
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import DOWNLOAD_DIR, TARGET_STORES, STORE_WORKERS, logger
 from driver import make_driver
 from utils import ensure_dir
 from gov_crawler import GovCrawler
-import time
 
-def main():
-    ensure_dir(DOWNLOAD_DIR)
+def crawl_store(frag, folder):
+    # WebDriver sessions are not thread-safe: every worker drives its own browser
     driver = make_driver()
-    crawler = GovCrawler(driver)
     try:
-        for frag, folder in TARGET_STORES:
-            try:
-                crawler.process_store(frag, folder)
-            except Exception as e:
-                logger.exception(f"Store {frag} failed: {e}")
-            time.sleep(0.9)
+        GovCrawler(driver).process_store(frag, folder)
     finally:
         try:
             driver.quit()
         except Exception:
             pass
+
+def main():
+    ensure_dir(DOWNLOAD_DIR)
+    with ThreadPoolExecutor(max_workers=min(STORE_WORKERS, len(TARGET_STORES))) as pool:
+        futures = {pool.submit(crawl_store, frag, folder): frag for frag, folder in TARGET_STORES}
+        for fut in as_completed(futures):
+            try:
+                fut.result()
+            except Exception as e:
+                logger.exception(f"Store {futures[fut]} failed: {e}")
     logger.info("All done.")
 
 if __name__ == "__main__":
@@ -9,12 +9,12 @@ import xml.etree.ElementTree as ET
 from datetime import datetime
 from urllib.parse import unquote_plus
 
-from io_utils import read_and_decompress_gz
+from io_utils import BOTO_CONFIG, open_object_stream
 
 # --- AWS clients ---
-s3 = boto3.client("s3")
-sqs = boto3.client("sqs")
-dynamo = boto3.client("dynamodb")
+s3 = boto3.client("s3", config=BOTO_CONFIG)
+sqs = boto3.client("sqs", config=BOTO_CONFIG)
+dynamo = boto3.client("dynamodb", config=BOTO_CONFIG)
 
 # --- Env vars ---
 BUCKET = os.environ.get("BUCKET_NAME")
@@ -24,12 +24,27 @@ DDB_TABLE = os.environ.get("DDB_TABLE")
 OUT_BUCKET = os.environ.get("OUT_BUCKET", "govil-price-lists")
 OUT_PREFIX = os.environ.get("OUT_PREFIX", "processed-json")
 
+# API batch limits (SQS caps a whole send_message_batch at the single-message size)
+SQS_BATCH_MAX = 10
+SQS_MAX_BYTES = 256 * 1024
+DDB_BATCH_MAX = 25
+
 logging.getLogger().setLevel(os.getenv("LOG_LEVEL", "INFO"))
 log = logging.getLogger(__name__)
 
+# …-<branch>-<yyyymmdd…>.gz  → the middle 3 digits
+BRANCH_RE = re.compile(r"-([0-9]{3})-")
+
+# Compact separators keep json on its C encoder (indent= forces the pure-Python path)
+JSON_SEPARATORS = (",", ":")
+
+
+def encode_doc(doc: dict) -> str:
+    return json.dumps(doc, ensure_ascii=False, separators=JSON_SEPARATORS)
+
 
 # ---------- JSON writer (NEW) ----------
-def write_output_json(src_key: str, provider: str, branch: str, doc: dict):
+def write_output_json(src_key: str, provider: str, branch: str, doc: dict, body: str):
 
     src_base = ntpath.basename(src_key).rsplit(".", 1)[0]
     out_key = f"{OUT_PREFIX}/{provider}/{branch}/{doc['type']}/{src_base}.json"
@@ -37,7 +52,7 @@ def write_output_json(src_key: str, provider: str, branch: str, doc: dict):
     s3.put_object(
         Bucket=OUT_BUCKET,
         Key=out_key,
-        Body=json.dumps(doc, ensure_ascii=False, indent=2).encode("utf-8"),
+        Body=body.encode("utf-8"),
         ContentType="application/json",
     )
     log.info("wrote JSON → s3://%s/%s (%d items)", OUT_BUCKET, out_key, len(doc.get("items", [])))
@@ -46,7 +61,11 @@ def write_output_json(src_key: str, provider: str, branch: str, doc: dict):
 # ---------- Lambda handler ----------
 def handler(event, context):
     log.info("price-extractor invoked")
-    log.info("RAW EVENT: %s", json.dumps(event, ensure_ascii=False))
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("RAW EVENT: %s", json.dumps(event, ensure_ascii=False))
+
+    # (key, body, marker) per record, flushed in batches after the loop
+    messages = []
 
     for rec in event.get("Records", []):
         s3evt = rec.get("s3", {})
@@ -57,22 +76,20 @@ def handler(event, context):
         key = unquote_plus(s3evt.get("object", {}).get("key", ""))
         etag = s3evt.get("object", {}).get("eTag")
 
-        try:
-            xml_bytes = read_and_decompress_gz(bucket, key)
-            root = ET.fromstring(xml_bytes)
-        except Exception as e:
-            log.exception("Failed reading/parsing %s: %s", key, e)
-            continue
-
         provider = provider_from_key(key)
         branch = branch_from_key(key)
         data_type = type_from_key(key)
 
-        # Parse items
-        if data_type == "pricesFull":
-            items = parse_price_items(root, provider)
-        else:
-            items = parse_promo_items(root, provider)
+        # Parse items: S3 body -> gunzip -> iterparse in one pass, no full copy in memory
+        try:
+            with open_object_stream(bucket, key) as xml_stream:
+                if data_type == "pricesFull":
+                    items = parse_price_items(xml_stream, provider)
+                else:
+                    items = parse_promo_items(xml_stream, provider)
+        except Exception as e:
+            log.exception("Failed reading/parsing %s: %s", key, e)
+            continue
 
         doc = {
             "provider": provider,
@@ -83,36 +100,101 @@ def handler(event, context):
         }
 
         log.info("✅ built doc (%s): %d items", data_type, len(items))
+        body = encode_doc(doc)
 
         #Write normalized JSON artifact to S3
         try:
-            write_output_json(key, provider, branch, doc)
+            write_output_json(key, provider, branch, doc, body)
         except Exception as e:
             log.exception("Failed writing processed JSON for %s: %s", key, e)
 
-        # 2) Send to SQS
+        # 2) Queue for SQS; 3) last-run marker for DynamoDB (written only once SQS accepted it)
+        marker = None
+        if DDB_TABLE and etag:
+            marker = {
+                "pk": {"S": f"{provider}#{branch}#{data_type}"},
+                "last_object_key": {"S": key},
+                "last_etag": {"S": etag},
+                "last_timestamp": {"S": doc["timestamp"]},
+            }
+        messages.append((key, body, marker))
+
+    sent = send_messages(messages)
+    markers = [marker for _, _, marker in sent if marker]
+    write_markers(markers)
+
+    return {"ok": True}
+
+
+# ---------- batched SQS / DynamoDB ----------
+def chunked(seq, size: int):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def sqs_batches(messages):
+    """Group (key, body, marker) tuples into batches within SQS's count and total-size limits.
+
+    A body that exceeds the limit on its own is yielded alone, flagged for send_message.
+    """
+    batch, size = [], 0
+    for m in messages:
+        n = len(m[1].encode("utf-8"))
+        if n > SQS_MAX_BYTES:
+            yield [m], True
+            continue
+        if batch and (len(batch) == SQS_BATCH_MAX or size + n > SQS_MAX_BYTES):
+            yield batch, False
+            batch, size = [], 0
+        batch.append(m)
+        size += n
+    if batch:
+        yield batch, False
+
+
+def send_messages(messages):
+    """Send (key, body, marker) tuples via send_message_batch; return the ones SQS accepted."""
+    sent = []
+    for batch, single in sqs_batches(messages):
+        if single:
+            # oversized: its own call, so a rejection costs only this record
+            key, body, _ = batch[0]
+            try:
+                sqs.send_message(QueueUrl=QUEUE_URL, MessageBody=body)
+                sent.append(batch[0])
+            except Exception as e:
+                log.exception("Failed sending to SQS for %s (%d bytes): %s", key, len(body.encode("utf-8")), e)
+            continue
+        entries = [{"Id": str(i), "MessageBody": body} for i, (_, body, _) in enumerate(batch)]
         try:
-            sqs.send_message(QueueUrl=QUEUE_URL, MessageBody=json.dumps(doc))
+            resp = sqs.send_message_batch(QueueUrl=QUEUE_URL, Entries=entries)
         except Exception as e:
-            log.exception("Failed sending to SQS for %s: %s", key, e)
+            log.exception("Failed sending SQS batch for %s: %s", [k for k, _, _ in batch], e)
             continue
-
-        # 3) Update last-run marker in DynamoDB
+        for f in resp.get("Failed", []):
+            key = batch[int(f["Id"])][0]
+            log.error("Failed sending to SQS for %s: %s %s", key, f.get("Code"), f.get("Message"))
+        ok_ids = {int(s["Id"]) for s in resp.get("Successful", [])}
+        sent.extend(m for i, m in enumerate(batch) if i in ok_ids)
+    return sent
+
+
+def write_markers(markers):
+    # batch_write_item rejects duplicate keys in one request: keep the last marker per pk
+    by_pk = {m["pk"]["S"]: m for m in markers}
+    items = list(by_pk.values())
+    for batch in chunked(items, DDB_BATCH_MAX):
         try:
-            if DDB_TABLE and etag:
-                dynamo.put_item(
-                    TableName=DDB_TABLE,
-                    Item={
-                        "pk": {"S": f"{provider}#{branch}#{data_type}"},
-                        "last_object_key": {"S": key},
-                        "last_etag": {"S": etag},
-                        "last_timestamp": {"S": doc["timestamp"]},
-                    },
-                )
+            resp = dynamo.batch_write_item(
+                RequestItems={DDB_TABLE: [{"PutRequest": {"Item": it}} for it in batch]}
+            )
+            unprocessed = resp.get("UnprocessedItems", {}).get(DDB_TABLE, [])
+            if unprocessed:
+                resp = dynamo.batch_write_item(RequestItems={DDB_TABLE: unprocessed})
+                if resp.get("UnprocessedItems"):
+                    log.error("DynamoDB left %d markers unprocessed", len(resp["UnprocessedItems"].get(DDB_TABLE, [])))
         except Exception as e:
-            log.exception("Failed updating DynamoDB marker for %s: %s", key, e)
-
-    return {"ok": True}
+            log.exception("Failed updating DynamoDB markers %s: %s", [it["pk"]["S"] for it in batch], e)
 
 
 # ---------- helpers ----------
@@ -125,8 +207,7 @@ def provider_from_key(key: str) -> str:
 
 
 def branch_from_key(key: str) -> str:
-    # …-<branch>-<yyyymmdd…>.gz  → capture the middle 3 digits
-    m = re.search(r"-([0-9]{3})-", key)
+    m = BRANCH_RE.search(key)
     return m.group(1) if m else "000"
 
 
@@ -139,54 +220,71 @@ def type_from_key(key: str) -> str:
 
 
 # ---------- parsing----------
-def parse_price_items(root: ET.Element, provider: str):
+def iter_elements(source, tag: str):
+    """Yield each completed `tag` element from an XML file/stream, then clear and detach it.
+
+    Keeps memory flat on large price files instead of holding the whole tree.
+    """
+    parents = []
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            parents.append(elem)
+            continue
+        parents.pop()
+        if elem.tag == tag:
+            yield elem
+            elem.clear()
+            if parents:
+                parents[-1].remove(elem)
+
+
+# provider -> (name tag, price tag, unit tag); unknown providers use the king-like layout
+PRICE_SCHEMA = {
+    "yohananof": ("ItemName", "ItemPrice", "UnitOfMeasure"),
+    "kingstore": ("ItemNm", "ItemPrice", "UnitOfMeasure"),
+    "maayan": ("ItemNm", "ItemPrice", "UnitOfMeasure"),
+}
+
+# provider -> (description tags, price tags); the first non-empty tag wins
+PROMO_SCHEMA = {
+    "yohananof": (("PromotionDescription",), ("DiscountedPrice",)),
+    "kingstore": (("PromotionDescription", "Description"), ("DiscountedPrice", "Price")),
+    "maayan": (("PromotionDescription", "Description"), ("DiscountedPrice", "Price")),
+}
+
+
+def first_text(elem, tags):
+    for tag in tags:
+        text = elem.findtext(tag)
+        if text:
+            return text
+    return None
+
+
+def parse_price_items(source, provider: str):
+    name_tag, price_tag, unit_tag = PRICE_SCHEMA.get(provider, PRICE_SCHEMA["kingstore"])
     items = []
-    if provider == "yohananof":
-        for item in root.findall(".//Item"):
-            name = (item.findtext("ItemName") or "unknown").strip()
-            price_text = item.findtext("ItemPrice") or "0"
-            unit = (item.findtext("UnitOfMeasure") or "").strip()
-            try:
-                price = float(price_text)
-            except Exception:
-                price = 0.0
-            items.append({"product": name, "price": price, "unit": unit})
-    else:
-        # kingstore, maayan
-        for item in root.findall(".//Item"):
-            name = (item.findtext("ItemNm") or "unknown").strip()
-            price_text = item.findtext("ItemPrice") or "0"
-            unit = (item.findtext("UnitOfMeasure") or "").strip()
-            try:
-                price = float(price_text)
-            except Exception:
-                price = 0.0
-            items.append({"product": name, "price": price, "unit": unit})
+    for item in iter_elements(source, "Item"):
+        name = (item.findtext(name_tag) or "unknown").strip()
+        price_text = item.findtext(price_tag) or "0"
+        unit = (item.findtext(unit_tag) or "").strip()
+        try:
+            price = float(price_text)
+        except Exception:
+            price = 0.0
+        items.append({"product": name, "price": price, "unit": unit})
     return items
 
 
-def parse_promo_items(root: ET.Element, provider: str):
+def parse_promo_items(source, provider: str):
+    desc_tags, price_tags = PROMO_SCHEMA.get(provider, PROMO_SCHEMA["kingstore"])
     promos = []
-    if provider == "yohananof":
-        for promo in root.findall(".//Promotion"):
-            desc = (promo.findtext("PromotionDescription") or "unknown").strip()
-            price_text = promo.findtext("DiscountedPrice") or "0"
-            try:
-                price = float(price_text)
-            except Exception:
-                price = 0.0
-            promos.append({"product": desc, "price": price, "unit": "unit"})
-    else:
-        for promo in root.findall(".//Promotion"):
-            desc = (
-                promo.findtext("PromotionDescription")
-                or promo.findtext("Description")
-                or "unknown"
-            ).strip()
-            price_text = (promo.findtext("DiscountedPrice") or promo.findtext("Price") or "0")
-            try:
-                price = float(price_text)
-            except Exception:
-                price = 0.0
-            promos.append({"product": desc, "price": price, "unit": "unit"})
+    for promo in iter_elements(source, "Promotion"):
+        desc = (first_text(promo, desc_tags) or "unknown").strip()
+        price_text = first_text(promo, price_tags) or "0"
+        try:
+            price = float(price_text)
+        except Exception:
+            price = 0.0
+        promos.append({"product": desc, "price": price, "unit": "unit"})
     return promos
@@ -1,14 +1,29 @@
-import boto3, gzip, zipfile, io, logging
+import boto3, gzip, zipfile, io, logging, contextlib
+from botocore.config import Config
 
-s3 = boto3.client('s3')
+# shared by all price-extractor clients: created once per warm container, keep-alive pool
+# sized above botocore's default of 10 connections
+BOTO_CONFIG = Config(
+    max_pool_connections=64,
+    retries={'max_attempts': 3, 'mode': 'standard'},
+    tcp_keepalive=True,
+)
+
+s3 = boto3.client('s3', config=BOTO_CONFIG)
 
 GZIP_MAGIC = b'\x1f\x8b'
 ZIP_MAGIC = b'PK'
+STREAM_BUFFER = 1024 * 1024
 
 def get_object_bytes(bucket: str, key: str) -> bytes:
     r = s3.get_object(Bucket=bucket, Key=key)
     return r['Body'].read()
 
+def pick_zip_member(names):
+    """Prefer XML-ish entries."""
+    xml_candidates = [n for n in names if n.lower().endswith((".xml", ".txt"))]
+    return xml_candidates[0] if xml_candidates else names[0]
+
 def inflate_bytes(blob: bytes) -> bytes:
     """Return inner bytes if ZIP/GZIP; else raw."""
     try:
@@ -20,10 +35,7 @@ def inflate_bytes(blob: bytes) -> bytes:
                 names = zf.namelist()
                 if not names:
                     return blob
-                # Prefer XML-ish entries
-                xml_candidates = [n for n in names if n.lower().endswith((".xml", ".txt"))]
-                name = xml_candidates[0] if xml_candidates else names[0]
-                return zf.read(name)
+                return zf.read(pick_zip_member(names))
         return blob
     except Exception:
         logging.exception("Inflation failed")
@@ -32,3 +44,54 @@ def inflate_bytes(blob: bytes) -> bytes:
 def read_and_decompress_gz(bucket: str, key: str) -> bytes:
     """Kept for backward-compat with prior imports."""
     return inflate_bytes(get_object_bytes(bucket, key))
+
+class _PrefixedStream(io.RawIOBase):
+    """Raw reader that replays already-sniffed `prefix` bytes before the rest of `body`."""
+
+    def __init__(self, prefix: bytes, body):
+        self._prefix = prefix
+        self._body = body
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._prefix:
+            chunk, self._prefix = self._prefix[:len(b)], self._prefix[len(b):]
+        else:
+            chunk = self._body.read(len(b))
+        b[:len(chunk)] = chunk
+        return len(chunk)
+
+    def close(self):
+        self._body.close()
+        super().close()
+
+@contextlib.contextmanager
+def open_object_stream(bucket: str, key: str):
+    """Yield a file-like reader over the object's inner bytes (GZIP/ZIP/raw), decompressed on the fly.
+
+    Everything opened here, down to the S3 body, is closed on exit, even if parsing fails partway.
+    """
+    body = s3.get_object(Bucket=bucket, Key=key)['Body']
+    with contextlib.ExitStack() as stack:
+        stack.callback(body.close)
+        head = body.read(len(GZIP_MAGIC))
+        stream = stack.enter_context(
+            io.BufferedReader(_PrefixedStream(head, body), buffer_size=STREAM_BUFFER))
+        try:
+            if head.startswith(GZIP_MAGIC):
+                reader = gzip.GzipFile(fileobj=stream)
+            elif head.startswith(ZIP_MAGIC):
+                # the central directory sits at the end, so the compressed archive is buffered;
+                # the XML member itself is still inflated incrementally
+                blob = stream.read()
+                zf = stack.enter_context(zipfile.ZipFile(io.BytesIO(blob)))
+                names = zf.namelist()
+                reader = zf.open(pick_zip_member(names)) if names else io.BytesIO(blob)
+            else:
+                reader = stream
+        except Exception:
+            logging.exception("Inflation failed")
+            raise
+        yield stack.enter_context(reader)
@@ -1,11 +1,20 @@
 # utils.py
 import os
+import shutil
 import certifi
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from botocore.exceptions import BotoCoreError, ClientError
 from datetime import datetime, timedelta
 import os
 from urllib.parse import urlparse, unquote, urljoin
-from config import ABS_DATE_RE, REL_HE_RE, logger
+from config import ABS_DATE_RE, REL_HE_RE, SPATH_RE, logger
+
+# network read / disk write size for streamed downloads
+DOWNLOAD_CHUNK = 1024 * 1024
+# certifi.where() resolves the bundle path on every call; look it up once
+CA_BUNDLE = certifi.where()
 
 def ensure_dir(p):
     os.makedirs(p, exist_ok=True)
@@ -43,9 +52,21 @@ def parse_relative_he(text):
         return now - timedelta(days=n)
     return now
 
-def session_from_driver(driver):
-    """Create requests.Session that copies cookies and user-agent from Selenium driver."""
+def make_pooled_session():
+    """requests.Session with a shared keep-alive connection pool and retry on transient 5xx."""
     s = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504]),
+    )
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+def session_from_driver(driver, session=None):
+    """Copy cookies and user-agent from Selenium driver onto `session` (a new pooled one if None)."""
+    s = session if session is not None else make_pooled_session()
     ua = driver.execute_script("return navigator.userAgent;")
     s.headers.update({"User-Agent": ua})
     for c in driver.get_cookies():
@@ -56,18 +77,55 @@ def session_from_driver(driver):
 def download_stream(session, url, dest, verify=True):
     """Stream file to `dest` using provided requests.Session."""
     try:
-        verify_target = certifi.where() if verify else False
+        verify_target = CA_BUNDLE if verify else False
         with session.get(url, stream=True, timeout=60, verify=verify_target) as r:
             r.raise_for_status()
-            with open(dest, "wb") as fh:
-                for chunk in r.iter_content(8192):
-                    if chunk:
-                        fh.write(chunk)
+            # keep iter_content's handling of Content-Encoding, then copy in C-sized blocks
+            r.raw.decode_content = True
+            with open(dest, "wb", buffering=DOWNLOAD_CHUNK) as fh:
+                shutil.copyfileobj(r.raw, fh, length=DOWNLOAD_CHUNK)
         return True
     except Exception as e:
         logger.error(f"Failed to download {url}: {e}")
         return False
 
+def resolve_download_aspx(session, download_ajax, verify=True):
+    """POST a provider's Download.aspx endpoint and return the SPath it points to (or None)."""
+    try:
+        r = session.post(download_ajax, timeout=20, verify=CA_BUNDLE if verify else False)
+        if r.status_code != 200:
+            return None
+        try:
+            data = r.json()
+            spath = ""
+            if isinstance(data, list) and data:
+                spath = data[0].get("SPath", "") or data[-1].get("SPath", "")
+            elif isinstance(data, dict):
+                spath = data.get("SPath", "")
+            if spath:
+                logger.info(f"Got SPath: {spath}")
+                return spath
+        except Exception:
+            m = SPATH_RE.search(r.text or "")
+            if m:
+                return m.group(1)
+    except Exception as e:
+        logger.warning(f"Download.aspx call failed for {download_ajax}: {e}")
+    return None
+
+def existing_s3_keys(s3_client, bucket, folder):
+    """Non-empty object keys already uploaded under `folder/` (one paginated listing per store)."""
+    keys = set()
+    try:
+        paginator = s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=f"{folder}/"):
+            for obj in page.get("Contents", []):
+                if obj.get("Size", 0) > 0:
+                    keys.add(obj["Key"])
+    except (ClientError, BotoCoreError) as e:
+        logger.warning(f"Could not list s3://{bucket}/{folder}/: {e}")
+    return keys
+
 # small helper to normalize file name from URLs
 def filename_from_url(u):
     return unquote(_os_module.path.basename(urlparse(u).path))
@@ -77,7 +135,10 @@ __all__ = [
     "ensure_dir",
     "parse_absolute_he_date",
     "parse_relative_he",
+    "make_pooled_session",
     "session_from_driver",
     "download_stream",
+    "resolve_download_aspx",
+    "existing_s3_keys",
     "filename_from_url",
 ]